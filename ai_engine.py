@@ -17,17 +17,31 @@ import json
 import requests
 import time
 import hashlib
-import pickle
 import os
 import re
 import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Optional, Callable, Tuple
-from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Callable, Tuple
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import difflib
 
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
 
 # ============================================================================
 # SCHEMA PARSER - Parse free-form English schema files
@@ -532,36 +546,200 @@ class FileWatcher:
 class AICache:
     """Caches AI responses to save API costs"""
     
+    # Entries older than this are treated as misses and deleted
+    CACHE_TTL = 7 * 86400
+    
     def __init__(self, cache_dir: str = ".ailib/cache"):
+        # Created on the first write, so runs that never cache anything
+        # don't create the directory
         self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.hits = 0
         self.misses = 0
         self.enabled = True
+        
+        # One indexed SQLite store when diskcache is installed (opened by
+        # _open_store), otherwise one file per entry in cache_dir
+        self._store = None
+        
+        # Recently used entries (cache_key -> (timestamp, data)), oldest first,
+        # so repeated hits in one process skip the disk
+        self._mem: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._mem_cap = 256
+        self.mem_hits = 0
+        # OrderedDict reordering isn't safe across threads (background
+        # analysis shares this cache with the caller)
+        self._mem_lock = threading.Lock()
+        
+        # Keys with an entry file (file store only), read from the directory
+        # on first use so misses don't stat the disk. Entries other processes
+        # write later are just misses here.
+        self._known_keys: Optional[set] = None
+    
+    def _remember(self, cache_key: str, timestamp: float, data: Dict):
+        """Put an entry in the in-memory LRU, evicting the least recently used"""
+        with self._mem_lock:
+            self._mem[cache_key] = (timestamp, data)
+            self._mem.move_to_end(cache_key)
+            if len(self._mem) > self._mem_cap:
+                self._mem.popitem(last=False)
+    
+    def key_for(self, prompt: str, context: str = "") -> str:
+        """Cache key for a prompt/context pair (pass it to get_by_key/set_by_key)"""
+        return self._get_cache_key(prompt, context)
     
     def _get_cache_key(self, prompt: str, context: str = "") -> str:
-        combined = f"{prompt}::{context}"
-        return hashlib.md5(combined.encode()).hexdigest()
+        # Hash the parts in turn instead of building one combined string.
+        # Keys only name files, so the fast non-cryptographic xxh3 is enough.
+        h = xxhash.xxh3_128() if xxhash else hashlib.blake2b(digest_size=16)
+        h.update(prompt.encode('utf-8'))
+        h.update(b'::')
+        h.update(context.encode('utf-8'))
+        return h.hexdigest()
+    
+    @staticmethod
+    def _dumps(cached: Dict) -> bytes:
+        """Serialize an entry - msgpack when installed, JSON otherwise (never pickle)"""
+        if msgpack is not None:
+            return msgpack.packb(cached, default=str)
+        return json.dumps(cached, default=str).encode('utf-8')
+    
+    @staticmethod
+    def _loads(data: bytes) -> Dict:
+        """Deserialize an entry written by _dumps"""
+        # JSON entries start with '{'; anything else was written by msgpack
+        if data[:1] == b'{':
+            return json.loads(data)
+        return msgpack.unpackb(data, raw=False)
+    
+    def _open_store(self, create: bool = False):
+        """
+        The diskcache store, opened on first use
+        
+        Returns None if the directory doesn't exist yet and create is False -
+        there's nothing to read, and opening would create it.
+        """
+        if self._store is None and (create or self.cache_dir.is_dir()):
+            self._store = diskcache.Cache(str(self.cache_dir))
+        return self._store
+    
+    def _entry_path(self, cache_key: str) -> Path:
+        """
+        Entry file for cache_key
+        
+        Sharded into subdirectories by the first two hex digits of the key
+        (like git objects), so no directory grows past a few thousand files.
+        """
+        return self.cache_dir / cache_key[:2] / f"{cache_key}.cache"
+    
+    def _entry_files(self, suffixes: Tuple[str, ...] = ('.cache',),
+                     flat: bool = False) -> Iterator[os.DirEntry]:
+        """
+        scandir entries of the entry files in the shard directories (none if
+        cache_dir doesn't exist). flat also yields files directly in cache_dir,
+        where entries lived before sharding.
+        """
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir() and len(entry.name) == 2:
+                        with os.scandir(entry.path) as shard:
+                            for shard_entry in shard:
+                                if shard_entry.name.endswith(suffixes):
+                                    yield shard_entry
+                    elif flat and entry.name.endswith(suffixes):
+                        yield entry
+        except FileNotFoundError:
+            return
+    
+    def _scan_keys(self) -> set:
+        """Keys of the entry files currently in cache_dir"""
+        return {e.name[:-6] for e in self._entry_files()}
+    
+    def _read_entry(self, cache_key: str) -> Optional[Dict]:
+        """Stored entry for cache_key, or None if missing/expired/unreadable"""
+        if diskcache is not None:
+            store = self._open_store()
+            if store is None:
+                return None
+            try:
+                # diskcache drops expired entries itself
+                data = store.get(cache_key)
+                return self._loads(data) if data is not None else None
+            except:
+                return None
+        
+        if self._known_keys is None:
+            self._known_keys = self._scan_keys()
+        if cache_key not in self._known_keys:
+            return None
+        
+        cache_file = self._entry_path(cache_key)
+        
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = self._loads(f.read())
+            if time.time() - cached['timestamp'] < self.CACHE_TTL:
+                return cached
+            else:
+                self._known_keys.discard(cache_key)
+                cache_file.unlink()
+        except FileNotFoundError:
+            # Deleted by another process
+            self._known_keys.discard(cache_key)
+        except:
+            pass
+        
+        return None
+    
+    def _write_entry(self, cache_key: str, cached: Dict):
+        """Store an entry (raises on failure)"""
+        data = self._dumps(cached)
+        
+        if diskcache is not None:
+            # Stored as raw bytes - diskcache only pickles non-bytes values
+            self._open_store(create=True).set(cache_key, data, expire=self.CACHE_TTL)
+            return
+        
+        cache_file = self._entry_path(cache_key)
+        try:
+            f = open(cache_file, 'wb')
+        except FileNotFoundError:
+            # Shard directory (and cache_dir) are created on first use
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            f = open(cache_file, 'wb')
+        with f:
+            f.write(data)
+        if self._known_keys is not None:
+            self._known_keys.add(cache_key)
     
     def get(self, prompt: str, context: str = "") -> Optional[Dict]:
         if not self.enabled:
             return None
         
-        cache_key = self._get_cache_key(prompt, context)
-        cache_file = self.cache_dir / f"{cache_key}.pkl"
+        return self.get_by_key(self._get_cache_key(prompt, context))
+    
+    def get_by_key(self, cache_key: str) -> Optional[Dict]:
+        """Like get(), for a key already computed with key_for()"""
+        if not self.enabled:
+            return None
         
-        if cache_file.exists():
-            try:
-                with open(cache_file, 'rb') as f:
-                    cached = pickle.load(f)
-                age = datetime.now() - cached['timestamp']
-                if age.days < 7:
+        # Callers get their own copy, so mutating a result can't change
+        # what later hits return
+        with self._mem_lock:
+            entry = self._mem.get(cache_key)
+            if entry is not None:
+                if time.time() - entry[0] < self.CACHE_TTL:
+                    self._mem.move_to_end(cache_key)
                     self.hits += 1
-                    return cached['data']
-                else:
-                    cache_file.unlink()
-            except:
-                pass
+                    self.mem_hits += 1
+                    return dict(entry[1])
+                del self._mem[cache_key]
+        
+        cached = self._read_entry(cache_key)
+        if cached is not None:
+            self.hits += 1
+            self._remember(cache_key, cached['timestamp'], cached['data'])
+            return dict(cached['data'])
         
         self.misses += 1
         return None
@@ -570,42 +748,64 @@ class AICache:
         if not self.enabled:
             return
         
-        cache_key = self._get_cache_key(prompt, context)
-        cache_file = self.cache_dir / f"{cache_key}.pkl"
+        self.set_by_key(self._get_cache_key(prompt, context), data, prompt)
+    
+    def set_by_key(self, cache_key: str, data: Dict, prompt: str = ""):
+        """Like set(), for a key already computed with key_for()"""
+        if not self.enabled:
+            return
         
         cached = {
-            'timestamp': datetime.now(),
+            'timestamp': time.time(),
             'data': data,
             'prompt_preview': prompt[:100]
         }
+        self._remember(cache_key, cached['timestamp'], dict(data))
         
         try:
-            with open(cache_file, 'wb') as f:
-                pickle.dump(cached, f)
+            self._write_entry(cache_key, cached)
         except Exception as e:
             print(f"⚠️  Could not cache response: {e}")
     
     def clear(self):
-        for cache_file in self.cache_dir.glob("*.pkl"):
+        if diskcache is not None and self._open_store() is not None:
+            self._store.clear()
+        
+        # *.pkl are entries from before the switch away from pickle; flat
+        # files are from before sharding
+        for entry in list(self._entry_files(('.cache', '.pkl'), flat=True)):
             try:
-                cache_file.unlink()
+                os.unlink(entry.path)
             except:
                 pass
+        with self._mem_lock:
+            self._mem.clear()
+        self._known_keys = None
         self.hits = 0
         self.misses = 0
+        self.mem_hits = 0
     
     def stats(self) -> Dict:
         total = self.hits + self.misses
         hit_rate = (self.hits / total * 100) if total > 0 else 0
-        cache_files = list(self.cache_dir.glob("*.pkl"))
-        total_size = sum(f.stat().st_size for f in cache_files)
+        if diskcache is not None:
+            store = self._open_store()
+            cached_responses = len(store) if store is not None else 0
+            total_size = store.volume() if store is not None else 0
+        else:
+            cached_responses = 0
+            total_size = 0
+            for entry in self._entry_files():
+                cached_responses += 1
+                total_size += entry.stat().st_size
         
         return {
             "hits": self.hits,
+            "memory_hits": self.mem_hits,
             "misses": self.misses,
             "total_requests": total,
             "hit_rate": f"{hit_rate:.1f}%",
-            "cached_responses": len(cache_files),
+            "cached_responses": cached_responses,
             "cache_size_mb": total_size / (1024 * 1024)
         }
 
@@ -815,10 +1015,14 @@ class GeminiEngine:
         """Make request to Gemini API with retry"""
         self.total_requests += 1
         
-        if use_cache and self.cache:
-            cached = self.cache.get(prompt, system_context)
+        # Hash prompt/context once for both the lookup and the store
+        cache_key = self.cache.key_for(prompt, system_context) if use_cache and self.cache else None
+        
+        if cache_key:
+            cached = self.cache.get_by_key(cache_key)
             if cached:
                 print("  💾 Using cached response")
+                # Already a copy of the in-memory entry
                 return cached
         
         self.rate_limiter.wait_if_needed()
@@ -863,8 +1067,8 @@ class GeminiEngine:
                     
                     result = {"success": True, "response": text}
                     
-                    if use_cache and self.cache:
-                        self.cache.set(prompt, system_context, result)
+                    if cache_key:
+                        self.cache.set_by_key(cache_key, result, prompt)
                     
                     return result
                 else:
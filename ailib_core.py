@@ -357,6 +357,7 @@ class UpgradedAILib:
     def set_api_key(self, api_key: str) -> Dict:
         try:
             self.config.set_api_key('gemini', api_key)
+            self.config.flush()
             src_path = self.workspace_root / "src"
             self.ai = GeminiEngine(api_key, workspace_root=str(src_path), enable_cache=True)
             
@@ -8,7 +8,13 @@ import os
 import json
 import shutil
 import sys
+import select
+import socket
+import struct
 import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
 from typing import Optional, Dict, List, Union
 import time
@@ -21,14 +27,26 @@ import time
 class ExtensionInstaller:
     """Install VS Code extension"""
     
+    # Bump whenever extension.js changes, so existing installs are replaced
+    VERSION = "1.1.0"
+    
     def __init__(self):
-        self.ext_path = Path.home() / ".vscode" / "extensions" / "ai-dev-terminal-1.0.0"
+        self.ext_dir = Path.home() / ".vscode" / "extensions"
+        self.ext_path = self.ext_dir / f"ai-dev-terminal-{self.VERSION}"
     
     def is_installed(self):
+        """True if any version is installed (older ones still answer over HTTP)"""
+        return self.is_current() or bool(self._old_versions())
+    
+    def is_current(self):
         return self.ext_path.exists()
     
+    def _old_versions(self):
+        return [p for p in self.ext_dir.glob("ai-dev-terminal-*") if p != self.ext_path]
+    
     def install(self):
-        if self.is_installed():
+        """Install, or replace an older version. Returns True if already current."""
+        if self.is_current():
             return True
         
         temp = Path("__temp_ext__")
@@ -37,7 +55,7 @@ class ExtensionInstaller:
         with open(temp / "package.json", "w") as f:
             json.dump({
                 "name": "ai-dev-terminal",
-                "version": "1.0.0",
+                "version": self.VERSION,
                 "engines": {"vscode": "^1.60.0"},
                 "activationEvents": ["*"],
                 "main": "./extension.js"
@@ -47,6 +65,7 @@ class ExtensionInstaller:
             f.write('''
 const vscode = require('vscode');
 const http = require('http');
+const net = require('net');
 
 let terminals = new Map();
 let counter = 0;
@@ -74,13 +93,42 @@ function activate(context) {
     
     server.listen(45678, 'localhost');
     context.subscriptions.push({dispose: () => server.close()});
+    
+    // Framed channel: persistent socket, 4-byte big-endian length + JSON body
+    const frameServer = net.createServer(sock => {
+        let buf = Buffer.alloc(0);
+        sock.on('data', chunk => {
+            buf = Buffer.concat([buf, chunk]);
+            while (buf.length >= 4) {
+                const len = buf.readUInt32BE(0);
+                if (buf.length < 4 + len) break;
+                const body = buf.subarray(4, 4 + len);
+                buf = buf.subarray(4 + len);
+                
+                let result;
+                try {
+                    result = handle(JSON.parse(body.toString()));
+                } catch (e) {
+                    result = {error: e.message};
+                }
+                const out = Buffer.from(JSON.stringify(result));
+                const head = Buffer.alloc(4);
+                head.writeUInt32BE(out.length, 0);
+                sock.write(Buffer.concat([head, out]));
+            }
+        });
+        sock.on('error', () => sock.destroy());
+    });
+    
+    frameServer.listen(45679, 'localhost');
+    context.subscriptions.push({dispose: () => frameServer.close()});
 }
 
 function handle(data) {
     switch (data.action) {
         case 'create': return create(data.name);
         case 'run': return run(data.id, data.cmd);
-        case 'monitor': return monitor(data.id);
+        case 'monitor': return monitor(data.id, data.since);
         case 'list': return list();
         default: return {error: 'Unknown action'};
     }
@@ -93,6 +141,7 @@ function create(name) {
         terminal: t,
         name: name,
         commands: [],
+        seq: 0,
         created: Date.now()
     });
     t.show();
@@ -103,21 +152,25 @@ function run(id, cmd) {
     const d = terminals.get(id);
     if (!d) return {error: 'Terminal not found'};
     
-    d.commands.push({cmd: cmd, time: Date.now()});
+    d.seq++;
+    d.commands.push({seq: d.seq, cmd: cmd, time: Date.now()});
     d.terminal.sendText(cmd);
     d.terminal.show();
     return {success: true};
 }
 
-function monitor(id) {
+function monitor(id, since) {
     const d = terminals.get(id);
     if (!d) return {error: 'Terminal not found'};
     
+    // Only ship commands the caller has not seen yet
+    since = since || 0;
     return {
         success: true,
         id: id,
         name: d.name,
-        commands: d.commands,
+        commands: d.commands.filter(c => c.seq > since),
+        head: d.seq,
         active: d.terminal.exitStatus === undefined,
         uptime: Date.now() - d.created
     };
@@ -144,6 +197,10 @@ module.exports = {activate, deactivate};
         shutil.copytree(temp, self.ext_path)
         shutil.rmtree(temp)
         
+        # VS Code would otherwise keep loading the old extension.js
+        for old in self._old_versions():
+            shutil.rmtree(old, ignore_errors=True)
+        
         print("✓ Extension installed. Reload VS Code: Ctrl+Shift+P → 'Reload Window'")
         return False
 
@@ -151,37 +208,131 @@ module.exports = {activate, deactivate};
 class TerminalBridge:
     """Communication bridge to VS Code extension"""
     
+    # How long (seconds) an HTTP-only extension counts as ready after answering
+    READY_TTL = 5
+    # How often (seconds) to try the framed port again once on HTTP - the
+    # extension may have been updated and reloaded since
+    FRAMED_RETRY_AFTER = 30
+    
     def __init__(self):
         self.url = "http://localhost:45678"
+        self.frame_addr = ("localhost", 45679)
+        self._sock = None
+        self._framed = True
+        self._framed_retry_at = 0.0
+        self._http_ready_until = 0.0
     
     def is_ready(self):
+        """
+        True if the extension is reachable
+        
+        Checked on the framed socket, which send() then reuses - no extra
+        round trip. Extensions without the framed channel get an HTTP
+        check, remembered for READY_TTL seconds.
+        """
+        now = time.monotonic()
+        if self._framed_due(now):
+            try:
+                self._connect()
+                self._framed = True
+                return True
+            except OSError:
+                self.close()
+                self._framed_retry_at = now + self.FRAMED_RETRY_AFTER
+        
+        if now < self._http_ready_until:
+            return True
         try:
             import urllib.request
             urllib.request.urlopen(self.url, timeout=1)
-            return True
         except:
             return False
+        
+        # HTTP answers but the framed port doesn't - extension predates it
+        self._framed = False
+        self._http_ready_until = now + self.READY_TTL
+        return True
     
     def send(self, action, **kwargs):
         import urllib.request
         
         data = json.dumps({"action": action, **kwargs}).encode()
+        
+        now = time.monotonic()
+        if self._framed_due(now):
+            try:
+                self._connect()
+                self._sock.sendall(struct.pack(">I", len(data)) + data)
+            except OSError:
+                # The extension never got a whole request - HTTP is safe
+                self.close()
+                self._framed_retry_at = now + self.FRAMED_RETRY_AFTER
+            else:
+                self._framed = True
+                try:
+                    size = struct.unpack(">I", self._recv_exact(4))[0]
+                    return json.loads(self._recv_exact(size))
+                except (OSError, ValueError) as e:
+                    # The request may already have run - resending it could
+                    # create a terminal or run a command twice
+                    self.close()
+                    return {"error": f"Extension reply failed: {e}"}
+        
         try:
             req = urllib.request.Request(self.url, data=data, headers={'Content-Type': 'application/json'})
             res = urllib.request.urlopen(req, timeout=5)
             return json.loads(res.read())
         except:
             return {"error": "Extension not responding"}
+    
+    def _framed_due(self, now):
+        """Use the framed socket - once on HTTP, only every FRAMED_RETRY_AFTER seconds"""
+        return self._framed or now >= self._framed_retry_at
+    
+    def _connect(self):
+        """Open the framed socket, or keep the open one if it is still alive"""
+        if self._sock is not None:
+            # Between requests nothing is sent to us, so the socket only
+            # turns readable once the extension has closed it
+            readable, _, _ = select.select([self._sock], [], [], 0)
+            if not readable:
+                return
+            self.close()
+        self._sock = socket.create_connection(self.frame_addr, timeout=5)
+    
+    def _recv_exact(self, size):
+        chunks = []
+        while size:
+            chunk = self._sock.recv(size)
+            if not chunk:
+                raise ConnectionError("Extension closed the connection")
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+    
+    def close(self):
+        """Drop the persistent socket (reconnects lazily on next send)"""
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
 
 
 class Terminal:
     """Terminal control with enhanced output capture"""
     
+    # Captured runs kept per terminal; oldest entries are evicted first
+    HISTORY_LIMIT = 1024
+    
     def __init__(self, mode="auto"):
         self.mode = mode
         self.bridge = None
         self.processes = {}
         self.counter = 0
+        self._last_seen = {}
+        self._command_cache = {}
         
         if mode in ["auto", "vscode"]:
             installer = ExtensionInstaller()
@@ -192,6 +343,10 @@ class Terminal:
                     sys.exit("Extension installed. Reload VS Code and run again.")
                 else:
                     self.mode = "system"
+            elif not installer.is_current():
+                # Older install - write the current extension.js; the old one
+                # keeps serving (over HTTP) until VS Code reloads
+                installer.install()
             
             if self.mode != "system":
                 self.bridge = TerminalBridge()
@@ -210,12 +365,18 @@ class Terminal:
                 return result.get("id")
         
         self.counter += 1
-        self.processes[self.counter] = {"name": name, "history": []}
+        self.processes[self.counter] = {
+            "name": name,
+            "history": deque(maxlen=self.HISTORY_LIMIT),
+            "seq": 0
+        }
         return self.counter
     
     def run(self, terminal_id, command, capture_output=False, timeout=30):
-        """Run command with optional output capture"""
-        if self.mode in ["vscode", "auto"] and self.bridge and self.bridge.is_ready():
+        """Run command with optional output capture (capture always runs locally)"""
+        # VS Code terminals can't hand output back, so captured runs go
+        # straight to a local subprocess without the bridge round-trip
+        if not capture_output and self.mode in ["vscode", "auto"] and self.bridge and self.bridge.is_ready():
             result = self.bridge.send("run", id=terminal_id, cmd=command)
             return result.get("success", False)
         
@@ -238,7 +399,10 @@ class Terminal:
                 }
                 
                 if terminal_id in self.processes:
-                    self.processes[terminal_id]["history"].append(output_data)
+                    proc = self.processes[terminal_id]
+                    proc["seq"] += 1
+                    output_data["seq"] = proc["seq"]
+                    proc["history"].append(output_data)
                 
                 return output_data
                 
@@ -248,22 +412,77 @@ class Terminal:
             subprocess.Popen(command, shell=True)
             return True
     
-    def monitor(self, terminal_id):
-        """Get terminal history"""
+    def monitor(self, terminal_id, since_seq=None):
+        """Get terminal history (only entries with seq > since_seq if given)"""
         if self.mode in ["vscode", "auto"] and self.bridge and self.bridge.is_ready():
-            result = self.bridge.send("monitor", id=terminal_id)
+            result = self._fetch_commands(terminal_id)
             if "error" not in result:
+                cache = self._command_cache.get(terminal_id)
+                if cache is None:
+                    # Older extension - result already holds the full history
+                    if since_seq is not None:
+                        result["commands"] = self._entries_since(result.get("commands", []), since_seq)
+                elif since_seq is None:
+                    result["commands"] = list(cache)
+                elif since_seq != result["since"]:
+                    result["commands"] = self._entries_since(cache, since_seq)
                 return result
         
         if terminal_id in self.processes:
+            proc = self.processes[terminal_id]
+            if since_seq is None:
+                history = list(proc["history"])
+            else:
+                history = self._entries_since(proc["history"], since_seq)
+            
             return {
                 "id": terminal_id,
-                "name": self.processes[terminal_id]["name"],
+                "name": proc["name"],
                 "mode": "system",
-                "history": self.processes[terminal_id]["history"]
+                "history": history,
+                "head": proc["seq"]
             }
         return None
     
+    @staticmethod
+    def _entries_since(entries, since_seq):
+        """Return entries with seq > since_seq, scanning back from the newest"""
+        new = []
+        for entry in reversed(entries):
+            if entry.get("seq", 0) <= since_seq:
+                break
+            new.append(entry)
+        new.reverse()
+        return new
+    
+    def _fetch_commands(self, terminal_id):
+        """
+        Pull only unseen commands from the extension into the local cache
+        
+        The result's "commands" are just the new ones and "since" is the seq
+        they follow; monitor() reads older entries from the cache.
+        """
+        since = self._last_seen.get(terminal_id, 0)
+        result = self.bridge.send("monitor", id=terminal_id, since=since)
+        
+        if "error" in result or "head" not in result:
+            # Older extension without seq support - sends full history
+            return result
+        
+        if result["head"] < since:
+            # Extension restarted and its counter was reset
+            self._command_cache.pop(terminal_id, None)
+            since = 0
+            result = self.bridge.send("monitor", id=terminal_id, since=0)
+            if "error" in result:
+                return result
+        
+        cache = self._command_cache.setdefault(terminal_id, deque(maxlen=self.HISTORY_LIMIT))
+        cache.extend(result.get("commands", []))
+        self._last_seen[terminal_id] = result["head"]
+        result["since"] = since
+        return result
+    
     def list(self):
         """List all terminals"""
         if self.mode in ["vscode", "auto"] and self.bridge and self.bridge.is_ready():
@@ -272,7 +491,7 @@ class Terminal:
                 return result.get("terminals", [])
         
         return [
-            {"id": tid, "name": data["name"], "commands": len(data["history"])}
+            {"id": tid, "name": data["name"], "commands": data["seq"]}
             for tid, data in self.processes.items()
         ]
 
@@ -284,13 +503,16 @@ class Terminal:
 class FileSystem:
     """Complete file system access for AI"""
     
+    # Operations kept in the log; oldest entries are evicted first
+    OPERATION_LOG_LIMIT = 1000
+    
     def __init__(self, workspace_root: str = "."):
         """
         Args:
             workspace_root: Root directory for operations (security boundary)
         """
         self.workspace_root = Path(workspace_root).resolve()
-        self.operation_log = []
+        self.operation_log = deque(maxlen=self.OPERATION_LOG_LIMIT)
     
     def _log(self, operation: str, path: str, success: bool, details: str = ""):
         """Log file operations for AI monitoring"""
@@ -629,11 +851,13 @@ class FileSystem:
     
     def get_operation_log(self, last_n: int = 50) -> List[Dict]:
         """Get recent file operations for AI monitoring"""
-        return self.operation_log[-last_n:]
+        recent = list(islice(reversed(self.operation_log), last_n))
+        recent.reverse()
+        return recent
     
     def clear_log(self):
         """Clear operation log"""
-        self.operation_log = []
+        self.operation_log.clear()
 
 
 # ============================================================================
@@ -646,6 +870,29 @@ class AIDevManager:
     Combines Terminal + FileSystem for full AI control
     """
     
+    # Project templates - "{name}"/"{name_json}" are filled in per project
+    _TEMPLATES = {
+        "python": {
+            "dirs": ["src", "tests", "docs"],
+            "files": {
+                "README.md": "# {name}\n\nPython project",
+                "requirements.txt": "",
+                ".gitignore": "venv/\n__pycache__/\n*.pyc\n.env\n",
+                "src/__init__.py": "",
+                "src/main.py": "def main():\n    print('Hello World')\n\nif __name__ == '__main__':\n    main()\n"
+            }
+        },
+        "node": {
+            "dirs": ["src", "tests"],
+            "files": {
+                "README.md": "# {name}\n\nNode.js project",
+                "package.json": '{{\n  "name": {name_json},\n  "version": "1.0.0",\n  "main": "src/index.js"\n}}',
+                ".gitignore": "node_modules/\n.env\n",
+                "src/index.js": "console.log('Hello World');\n"
+            }
+        }
+    }
+    
     def __init__(self, workspace_root: str = ".", terminal_mode: str = "auto"):
         """
         Args:
@@ -666,45 +913,24 @@ class AIDevManager:
             project_name: Project folder name
             project_type: "python", "node", "react", etc.
         """
-        templates = {
-            "python": {
-                "dirs": ["src", "tests", "docs"],
-                "files": {
-                    "README.md": f"# {project_name}\n\nPython project",
-                    "requirements.txt": "",
-                    ".gitignore": "venv/\n__pycache__/\n*.pyc\n.env\n",
-                    "src/__init__.py": "",
-                    "src/main.py": "def main():\n    print('Hello World')\n\nif __name__ == '__main__':\n    main()\n"
-                }
-            },
-            "node": {
-                "dirs": ["src", "tests"],
-                "files": {
-                    "README.md": f"# {project_name}\n\nNode.js project",
-                    "package.json": json.dumps({
-                        "name": project_name,
-                        "version": "1.0.0",
-                        "main": "src/index.js"
-                    }, indent=2),
-                    ".gitignore": "node_modules/\n.env\n",
-                    "src/index.js": "console.log('Hello World');\n"
-                }
-            }
-        }
-        
-        template = templates.get(project_type, templates["python"])
+        template = self._TEMPLATES.get(project_type, self._TEMPLATES["python"])
+        fields = {"name": project_name, "name_json": json.dumps(project_name)}
         
         try:
-            # Create project directory
-            self.fs.create_directory(project_name)
-            
-            # Create subdirectories
+            # Create subdirectories (the project dir is created along with them)
             for dir_name in template["dirs"]:
                 self.fs.create_directory(f"{project_name}/{dir_name}")
             
-            # Create files
-            for file_path, content in template["files"].items():
-                self.fs.write_file(f"{project_name}/{file_path}", content)
+            # Create files - independent writes, so overlap them
+            files = {
+                path: content.format(**fields) if "{name" in content else content
+                for path, content in template["files"].items()
+            }
+            with ThreadPoolExecutor(max_workers=min(8, len(files) or 1)) as executor:
+                list(executor.map(
+                    lambda item: self.fs.write_file(f"{project_name}/{item[0]}", item[1]),
+                    files.items()
+                ))
             
             return {
                 "success": True,
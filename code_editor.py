@@ -7,10 +7,35 @@ DEPENDENCIES: Uses YOUR file_access.py for reading/writing files
 """
 
 import ast
+import hashlib
+import keyword
 import re
-from typing import Dict, List, Optional
+import threading
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Dict, List, Optional, Pattern, Tuple
 from dataclasses import dataclass
 
+# Optional: tree-sitter enables incremental re-parsing of edited files
+try:
+    import tree_sitter_python as _ts_python
+    from tree_sitter import Language as _TSLanguage, Parser as _TSParser
+except ImportError:
+    _ts_python = None
+
+# tree-sitter node types that can hold a def/class somewhere below them.
+# Definitions never occur inside expressions, so the tree walk only visits
+# these and costs O(statements) rather than O(nodes).
+_TS_CONTAINERS = frozenset({
+    'block', 'decorated_definition', 'function_definition', 'class_definition',
+    'if_statement', 'elif_clause', 'else_clause', 'for_statement',
+    'while_statement', 'try_statement', 'except_clause', 'except_group_clause',
+    'finally_clause', 'with_statement', 'match_statement', 'case_clause'
+})
+# Wrapper nodes ast has no level for - descended through in place
+_TS_TRANSPARENT = frozenset({'block', 'decorated_definition', 'else_clause', 'finally_clause'})
+_TS_BRANCHES = ('elif_clause', 'else_clause')
+
 
 # ================================================================================
 # CODE ELEMENT - Represents a function or class in code
@@ -28,6 +53,8 @@ class CodeElement:
         end_line: Ending line number
         content: The actual code
         indentation: Indentation level
+        start_offset: Character offset of start_line in the parsed source
+        end_offset: Character offset just past end_line in the parsed source
     """
     type: str
     name: str
@@ -35,6 +62,21 @@ class CodeElement:
     end_line: int
     content: str
     indentation: int = 0
+    start_offset: int = 0
+    end_offset: int = 0
+
+
+class ParsedCode(list):
+    """
+    List of CodeElement from one parse, plus a name index
+    
+    by_name maps each name to its first element (what a linear
+    find_element would return), built once when the parse finishes.
+    """
+    
+    def __init__(self, elements=()):
+        super().__init__(elements)
+        self.by_name: Dict[str, CodeElement] = {e.name: e for e in reversed(self)}
 
 
 # ================================================================================
@@ -50,12 +92,59 @@ class CodeAnalyzer:
     - Find all classes in a file
     - Find specific function by name
     - Get line numbers for each element
+    - Incremental re-parse after edits (when tree-sitter is installed)
     """
     
     def __init__(self):
-        pass
+        # filepath -> (tree, source bytes) of the last tree-sitter parse
+        self._ts_parser = self._make_ts_parser()
+        self._trees: "OrderedDict[str, tuple]" = OrderedDict()
+        self._trees_size = 32
+        # Parser and tree store are shared by every editor (see get_shared_analyzer)
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _make_ts_parser():
+        if _ts_python is None:
+            return None
+        try:
+            language = _TSLanguage(_ts_python.language())
+            try:
+                return _TSParser(language)
+            except TypeError:
+                # Older py-tree-sitter API
+                parser = _TSParser()
+                parser.set_language(language)
+                return parser
+        except Exception:
+            return None
+    
+    @property
+    def incremental(self) -> bool:
+        """True if parse_python_incremental can reuse previous trees"""
+        return self._ts_parser is not None
+    
+    @staticmethod
+    def line_offsets(buf) -> List[int]:
+        """
+        Offset where each line starts, plus a trailing len(buf) sentinel
+        
+        offsets[i] is the start of line i (0-based), so lines start..end-1
+        are buf[offsets[start]:offsets[end]]. Byte offsets for bytes,
+        character offsets for str.
+        """
+        newline = '\n' if isinstance(buf, str) else b'\n'
+        offsets = [0] * (buf.count(newline) + 2)
+        i = 1
+        pos = buf.find(newline)
+        while pos != -1:
+            offsets[i] = pos + 1
+            i += 1
+            pos = buf.find(newline, pos + 1)
+        offsets[i] = len(buf)
+        return offsets
     
-    def parse_python(self, code: str) -> List[CodeElement]:
+    def parse_python(self, code: str) -> ParsedCode:
         """
         Parse Python code into elements (functions, classes)
         
@@ -63,13 +152,21 @@ class CodeAnalyzer:
             code: Python source code
         
         Returns:
-            List of CodeElement objects
+            ParsedCode (list of CodeElement objects, indexed by name)
         """
         elements = []
         
         try:
             tree = ast.parse(code)
-            lines = code.split('\n')
+            
+            # Slice element source straight out of code instead of splitting
+            # into lines and re-joining per node; the offsets are kept on the
+            # elements so editors can splice without splitting either
+            offsets = self.line_offsets(code)
+            
+            def source(start: int, end: int) -> str:
+                text = code[offsets[start]:offsets[end]]
+                return text[:-1] if text.endswith('\n') else text
             
             for node in ast.walk(tree):
                 # Find functions
@@ -82,8 +179,10 @@ class CodeAnalyzer:
                         name=node.name,
                         start_line=start,
                         end_line=end,
-                        content='\n'.join(lines[start:end]),
-                        indentation=node.col_offset
+                        content=source(start, end),
+                        indentation=node.col_offset,
+                        start_offset=offsets[start],
+                        end_offset=offsets[end]
                     ))
                 
                 # Find classes
@@ -96,37 +195,343 @@ class CodeAnalyzer:
                         name=node.name,
                         start_line=start,
                         end_line=end,
-                        content='\n'.join(lines[start:end]),
-                        indentation=node.col_offset
+                        content=source(start, end),
+                        indentation=node.col_offset,
+                        start_offset=offsets[start],
+                        end_offset=offsets[end]
                     ))
         
         except SyntaxError:
             # Code has syntax errors - return empty list
             pass
         
-        return elements
+        return ParsedCode(elements)
+    
+    def parse_python_incremental(self, filepath: str, new_code: str,
+                                 edit: Optional[Tuple[int, int, int]] = None) -> ParsedCode:
+        """
+        Parse Python code, re-using the previous tree of filepath where possible
+        
+        Args:
+            filepath: Key for the stored tree (file being edited)
+            new_code: Current source code
+            edit: (start_byte, old_end_byte, new_end_byte) of the change made
+                  since the last parse of filepath, if known
+        
+        Returns:
+            ParsedCode of CodeElement objects (falls back to parse_python
+            when tree-sitter is missing or the code has syntax errors)
+        """
+        if self._ts_parser is None:
+            return self.parse_python(new_code)
+        
+        buf = new_code.encode('utf-8')
+        with self._lock:
+            previous = self._trees.pop(filepath, None)
+            tree = None
+            
+            if previous is not None and edit is not None:
+                old_tree, old_buf = previous
+                start, old_end, new_end = edit
+                # Only trust the old tree if it really is the source before this edit
+                if (old_buf[:start] == buf[:start]
+                        and old_buf[old_end:] == buf[new_end:]):
+                    old_tree.edit(
+                        start_byte=start,
+                        old_end_byte=old_end,
+                        new_end_byte=new_end,
+                        start_point=self._point(old_buf, start),
+                        old_end_point=self._point(old_buf, old_end),
+                        new_end_point=self._point(buf, new_end)
+                    )
+                    tree = self._ts_parser.parse(buf, old_tree)
+            elif previous is not None and previous[1] == buf:
+                tree = previous[0]
+            
+            if tree is None:
+                tree = self._ts_parser.parse(buf)
+            
+            self._trees[filepath] = (tree, buf)
+            if len(self._trees) > self._trees_size:
+                self._trees.popitem(last=False)
+        
+        if tree.root_node.has_error:
+            # Match parse_python, which only reports elements for valid code
+            return self.parse_python(new_code)
+        
+        return self._elements_from_tree(tree, buf, new_code)
+    
+    @staticmethod
+    def _point(buf: bytes, offset: int) -> Tuple[int, int]:
+        """(row, column) of a byte offset, as tree-sitter expects"""
+        row = buf.count(b'\n', 0, offset)
+        return (row, offset - (buf.rfind(b'\n', 0, offset) + 1))
+    
+    @staticmethod
+    def _code_end(node):
+        """Last non-comment token of node (ast's end_lineno ignores trailing comments)"""
+        while True:
+            children = [c for c in node.children if c.type != 'comment']
+            if not children:
+                return node
+            node = children[-1]
+    
+    @staticmethod
+    def _ts_children(node) -> list:
+        """
+        Children of node that can hold definitions, arranged like ast's
+        
+        ast nests each elif (and a final else) in the previous branch's
+        orelse, where tree-sitter makes them all siblings under the if.
+        """
+        children = [c for c in node.named_children
+                    if c.type in _TS_CONTAINERS and c.type not in _TS_BRANCHES]
+        
+        if node.type == 'if_statement':
+            branch = next((c for c in node.named_children if c.type in _TS_BRANCHES), None)
+        elif node.type == 'elif_clause':
+            branch = node.next_named_sibling
+            while branch is not None and branch.type == 'comment':
+                branch = branch.next_named_sibling
+            if branch is not None and branch.type not in _TS_BRANCHES:
+                branch = None
+        else:
+            # for/while/try else clauses are direct children in ast too
+            return [c for c in node.named_children if c.type in _TS_CONTAINERS]
+        
+        if branch is not None:
+            children.append(branch)
+        return children
+    
+    def _elements_from_tree(self, tree, buf: bytes, code: str) -> ParsedCode:
+        """Collect functions/classes breadth-first, in the same order as ast.walk"""
+        mv = memoryview(buf)
+        kinds = {'function_definition': 'function', 'class_definition': 'class'}
+        elements = []
+        
+        # ASCII source: character offsets are byte offsets, so line starts
+        # come straight from the nodes without scanning the whole file
+        offsets = None if len(buf) == len(code) else self.line_offsets(code)
+        
+        queue = deque([tree.root_node])
+        while queue:
+            node = queue.popleft()
+            kind = kinds.get(node.type)
+            if kind:
+                name = node.child_by_field_name('name')
+                start = node.start_point[0]
+                last = self._code_end(node)
+                end_row, end_col = last.end_point
+                end = end_row + 1 if end_col else end_row
+                
+                if offsets is None:
+                    start_offset = node.start_byte - node.start_point[1]
+                    end_offset = last.end_byte
+                    if end_col:
+                        newline = buf.find(b'\n', end_offset)
+                        end_offset = newline + 1 if newline != -1 else len(buf)
+                else:
+                    start_offset = offsets[start]
+                    end_offset = offsets[end]
+                
+                text = code[start_offset:end_offset]
+                elements.append(CodeElement(
+                    type=kind,
+                    name=bytes(mv[name.start_byte:name.end_byte]).decode('utf-8'),
+                    start_line=start,
+                    end_line=end,
+                    content=text[:-1] if text.endswith('\n') else text,
+                    indentation=node.start_point[1],
+                    start_offset=start_offset,
+                    end_offset=end_offset
+                ))
+            
+            children = deque(self._ts_children(node))
+            while children:
+                child = children.popleft()
+                if child.type in _TS_TRANSPARENT:
+                    children.extendleft(reversed(self._ts_children(child)))
+                else:
+                    queue.append(child)
+        
+        return ParsedCode(elements)
     
     def find_element(self, elements: List[CodeElement], name: str) -> Optional[CodeElement]:
         """
         Find a specific element by name
         
         Args:
-            elements: List of CodeElement
+            elements: List of CodeElement (ParsedCode is looked up by name)
             name: Name to search for
         
         Returns:
             CodeElement or None if not found
         """
+        if isinstance(elements, ParsedCode):
+            return elements.by_name.get(name)
+        
         for elem in elements:
             if elem.name == name:
                 return elem
         return None
 
 
+_shared_analyzer: Optional[CodeAnalyzer] = None
+_shared_analyzer_lock = threading.Lock()
+
+
+def get_shared_analyzer() -> CodeAnalyzer:
+    """
+    Process-wide CodeAnalyzer
+    
+    Builds the tree-sitter parser once and lets incremental trees survive
+    across SmartCodeEditor instances.
+    """
+    global _shared_analyzer
+    if _shared_analyzer is None:
+        with _shared_analyzer_lock:
+            if _shared_analyzer is None:
+                _shared_analyzer = CodeAnalyzer()
+    return _shared_analyzer
+
+
+# ================================================================================
+# EDITS - Operations that SmartCodeEditor.apply_edits can batch
+# ================================================================================
+
+@dataclass
+class Edit:
+    """Base class for one edit applied by SmartCodeEditor.apply_edits"""
+
+
+@dataclass
+class UpdateFunction(Edit):
+    """Replace a function with new_implementation"""
+    function_name: str
+    new_implementation: str
+
+
+@dataclass
+class AddMethod(Edit):
+    """Append method_code to the end of a class"""
+    class_name: str
+    method_code: str
+
+
+@dataclass
+class AddImport(Edit):
+    """Add import_statement after the existing imports (if not present)"""
+    import_statement: str
+
+
+@dataclass
+class RenameFunction(Edit):
+    """Rename a function definition and its calls"""
+    old_name: str
+    new_name: str
+
+
 # ================================================================================
 # SMART CODE EDITOR - Modify code intelligently
 # ================================================================================
 
+# Leading import line (incl. its newline) / first line that is real code
+_IMPORT_LINE = re.compile(r'^[^\S\n]*(?:import |from ).*\n?', re.M)
+_CODE_LINE = re.compile(r'^[^\S\n]*(?!import |from |#)\S', re.M)
+
+
+@lru_cache(maxsize=512)
+def _compile_import_present(import_statement: str) -> Pattern:
+    """Matches import_statement as a whole top-level line (compiled once per statement)"""
+    return re.compile(rf'^{re.escape(import_statement)}[^\S\n]*$', re.M)
+
+
+@lru_cache(maxsize=512)
+def _compile_rename(old_name: str) -> Pattern:
+    """One pattern matching both `def old_name` and `old_name(` (compiled once per name)"""
+    name = re.escape(old_name)
+    return re.compile(rf'\bdef {name}\b|\b{name}\(')
+
+
+def _rename_regex(code: str, old_name: str, new_name: str) -> Tuple[str, int, int]:
+    """Rename with the _compile_rename pattern; returns (new_code, definitions, calls)"""
+    # Single scan: def old_name -> def new_name, old_name( -> new_name(
+    # subn counts every match, so the callback only tallies definitions
+    definition = f'def {new_name}'
+    call = f'{new_name}('
+    def_count = 0
+    
+    def replace(match):
+        nonlocal def_count
+        if match.group(0).startswith('def '):
+            def_count += 1
+            return definition
+        return call
+    
+    new_code, total = _compile_rename(old_name).subn(replace, code)
+    return new_code, def_count, total - def_count
+
+
+def _indent(text: str, pad: str) -> str:
+    """
+    Prefix each non-blank line of text with pad
+    
+    Like textwrap.indent, but splits on '\n' only - str.splitlines also
+    breaks on form feeds, \x1c-\x1e, \x85 and \u2028, which would indent
+    inside string literals and shift offsets away from the line map.
+    """
+    return '\n'.join(pad + line if line.strip() else line for line in text.split('\n'))
+
+
+def _is_word_char(char: str) -> bool:
+    """Same test as regex \\w on str"""
+    return char.isalnum() or char == '_'
+
+
+def _rename_identifier(code: str, old_name: str, new_name: str) -> Tuple[str, int, int]:
+    """
+    Same matches as _rename_regex for an identifier, found with str.find
+    
+    Only the occurrences of old_name are looked at in Python, instead of
+    stepping the regex engine through the whole file.
+    """
+    parts = []
+    def_count = call_count = 0
+    size = len(old_name)
+    last = 0
+    
+    pos = code.find(old_name)
+    while pos != -1:
+        end = pos + size
+        after = code[end:end + 1]
+        
+        if pos and _is_word_char(code[pos - 1]):
+            # Inside a longer identifier
+            pos = code.find(old_name, pos + 1)
+            continue
+        
+        if (code.startswith('def ', pos - 4) and pos >= 4
+                and not (pos > 4 and _is_word_char(code[pos - 5]))
+                and not (after and _is_word_char(after))):
+            def_count += 1
+        elif after == '(':
+            call_count += 1
+        else:
+            pos = code.find(old_name, pos + 1)
+            continue
+        
+        parts.append(code[last:pos])
+        parts.append(new_name)
+        last = end
+        pos = code.find(old_name, end)
+    
+    if last == 0:
+        return code, 0, 0
+    
+    parts.append(code[last:])
+    return ''.join(parts), def_count, call_count
+
+
 class SmartCodeEditor:
     """
     Smart code editor that modifies code without rewriting entire files
@@ -138,6 +543,7 @@ class SmartCodeEditor:
     - Add new method to existing class
     - Add import statement
     - Rename function across file
+    - Batch several edits into one read/parse/write (apply_edits)
     
     Example:
         editor = SmartCodeEditor(fs_manager)
@@ -152,7 +558,258 @@ class SmartCodeEditor:
             fs_manager: FileSystem instance from YOUR file_access.py
         """
         self.fs = fs_manager
-        self.analyzer = CodeAnalyzer()
+        self.analyzer = get_shared_analyzer()
+        
+        # filepath -> (content hash, parsed elements), oldest evicted first
+        self._parse_cache: "OrderedDict[str, Tuple[str, ParsedCode]]" = OrderedDict()
+        self._parse_cache_size = 32
+    
+    def _get_elements(self, filepath: str, code: str) -> ParsedCode:
+        """Parse code, reusing the cached result if this file's content is unchanged"""
+        digest = hashlib.blake2b(code.encode('utf-8'), digest_size=16).hexdigest()
+        
+        cached = self._parse_cache.get(filepath)
+        if cached and cached[0] == digest:
+            self._parse_cache.move_to_end(filepath)
+            return cached[1]
+        
+        return self._store_elements(
+            filepath, digest, self.analyzer.parse_python_incremental(filepath, code)
+        )
+    
+    def _store_elements(self, filepath: str, digest: str,
+                        elements: ParsedCode) -> ParsedCode:
+        """Remember parsed elements for filepath, evicting the oldest entry"""
+        self._parse_cache[filepath] = (digest, elements)
+        self._parse_cache.move_to_end(filepath)
+        if len(self._parse_cache) > self._parse_cache_size:
+            self._parse_cache.popitem(last=False)
+        
+        return elements
+    
+    def _invalidate(self, filepath: str):
+        """Drop cached parse after the file was rewritten"""
+        self._parse_cache.pop(filepath, None)
+    
+    @staticmethod
+    def _content_changed(old: str, new: str) -> bool:
+        """True if an edit actually changed the file (length check first, then compare)"""
+        return old is not new and (len(old) != len(new) or old != new)
+    
+    # ============================================================================
+    # APPLY EDITS - Several edits with one read, one parse and one write
+    # ============================================================================
+    
+    def apply_edits(self, filepath: str, edits: List[Edit]) -> Dict:
+        """
+        Apply several edits to one file with a single read, parse and write
+        
+        Function, method and import edits are located in the file as read
+        and spliced in from the end of the file backwards, so the offsets of
+        the remaining edits stay valid. Renames run last, over the result.
+        If any edit fails, nothing is written.
+        
+        Args:
+            filepath: File path
+            edits: UpdateFunction / AddMethod / AddImport / RenameFunction items
+        
+        Returns:
+            {"success": True, "edits": [...]} with one change dict per edit,
+            plus "skipped": True when the file content is unchanged
+        
+        Example:
+            editor.apply_edits("app.py", [
+                AddImport("import json"),
+                AddMethod("User", method_code),
+                RenameFunction("authenticate", "login_user")
+            ])
+        """
+        
+        result = self.fs.read_file(filepath)
+        if not result['success']:
+            return result
+        
+        code = result['content']
+        elements = None
+        splices = []                # (start, end, order, text)
+        changes = [None] * len(edits)
+        
+        try:
+            for order, edit in enumerate(edits):
+                if isinstance(edit, RenameFunction):
+                    continue
+                if elements is None and not isinstance(edit, AddImport):
+                    # Parse once for every edit that needs element positions
+                    elements = self._get_elements(filepath, code)
+                
+                if isinstance(edit, UpdateFunction):
+                    splice, changes[order] = self._plan_update(filepath, code, elements, edit)
+                elif isinstance(edit, AddMethod):
+                    splice, changes[order] = self._plan_add_method(code, elements, edit)
+                elif isinstance(edit, AddImport):
+                    splice, changes[order] = self._plan_add_import(code, edit)
+                else:
+                    raise ValueError(f"Unsupported edit: {edit!r}")
+                
+                if splice:
+                    splices.append((splice[0], splice[1], order, splice[2]))
+            
+            splices.sort()
+            for previous, current in zip(splices, splices[1:]):
+                if current[0] < previous[1]:
+                    raise ValueError(
+                        f"Edits {previous[2]} and {current[2]} overlap in {filepath}"
+                    )
+            
+            # Highest offset first, so earlier offsets are still valid
+            new_code = code
+            for start, end, _, text in reversed(splices):
+                new_code = new_code[:start] + text + new_code[end:]
+            
+            renamed = False
+            for order, edit in enumerate(edits):
+                if isinstance(edit, RenameFunction):
+                    new_code, changes[order] = self._rename(new_code, edit)
+                    renamed = True
+        
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+        
+        if not self._content_changed(code, new_code):
+            return {"success": True, "skipped": True, "edits": changes}
+        
+        write_result = self.fs.write_file(filepath, new_code)
+        
+        if write_result['success']:
+            if self.analyzer.incremental and splices and not renamed:
+                # Re-parse only the range the splices touched
+                start = splices[0][0]
+                old_end = max(splice[1] for splice in splices)
+                new_end = old_end + len(new_code) - len(code)
+                self._reparse(filepath, code, new_code, start, old_end, new_end)
+            else:
+                self._invalidate(filepath)
+            write_result['edits'] = changes
+        
+        return write_result
+    
+    def _reparse(self, filepath: str, code: str, new_code: str,
+                 start: int, old_end: int, new_end: int):
+        """Incrementally re-parse after code[start:old_end] became new_code[start:new_end]"""
+        if code.isascii() and new_code.isascii():
+            start_byte, old_end_byte, new_end_byte = start, old_end, new_end
+        else:
+            start_byte = len(code[:start].encode('utf-8'))
+            old_end_byte = start_byte + len(code[start:old_end].encode('utf-8'))
+            new_end_byte = start_byte + len(new_code[start:new_end].encode('utf-8'))
+        
+        elements = self.analyzer.parse_python_incremental(
+            filepath, new_code, (start_byte, old_end_byte, new_end_byte)
+        )
+        self._store_elements(
+            filepath,
+            hashlib.blake2b(new_code.encode('utf-8'), digest_size=16).hexdigest(),
+            elements
+        )
+    
+    def _plan_update(self, filepath: str, code: str, elements: ParsedCode,
+                     edit: UpdateFunction) -> Tuple[Tuple[int, int, str], Dict]:
+        """Splice replacing one function, and its change summary"""
+        func = self.analyzer.find_element(elements, edit.function_name)
+        
+        if not func:
+            raise ValueError(f"Function '{edit.function_name}' not found in {filepath}")
+        
+        # Preserve original indentation
+        indented_new = _indent(edit.new_implementation, ' ' * func.indentation)
+        
+        start, end = func.start_offset, func.end_offset
+        if code.endswith('\n', start, end) and not indented_new.endswith('\n'):
+            indented_new += '\n'
+        
+        unchanged = code[start:end] == indented_new
+        return (start, end, indented_new), {
+            "function": edit.function_name,
+            "lines_replaced": 0 if unchanged else func.end_line - func.start_line,
+            "file": filepath
+        }
+    
+    def _plan_add_method(self, code: str, elements: ParsedCode,
+                         edit: AddMethod) -> Tuple[Tuple[int, int, str], Dict]:
+        """Splice inserting a method at the end of its class"""
+        cls = self.analyzer.find_element(elements, edit.class_name)
+        
+        if not cls:
+            raise ValueError(f"Class '{edit.class_name}' not found")
+        
+        # Insert method right after the last line of the class
+        insert_at = cls.end_offset
+        
+        # Add proper indentation (class level + 4 spaces)
+        method_text = _indent(edit.method_code, ' ' * (cls.indentation + 4))
+        if method_text and not method_text.endswith('\n'):
+            method_text += '\n'
+        
+        # Class ends the file without a trailing newline
+        separator = '\n' if code.endswith('\n', 0, insert_at) else '\n\n'
+        
+        # Blank line before method
+        return (insert_at, insert_at, separator + method_text), {
+            "class": edit.class_name,
+            "method_added": True
+        }
+    
+    def _plan_add_import(self, code: str,
+                         edit: AddImport) -> Tuple[Optional[Tuple[int, int, str]], Dict]:
+        """Splice inserting an import after the leading imports (None if present)"""
+        import_statement = edit.import_statement
+        stripped = import_statement.strip()
+        
+        # Check if import already exists (whole line, not a substring);
+        # the substring test rules most files out before the regex runs
+        if stripped in code and _compile_import_present(stripped).search(code):
+            return None, {
+                "import": import_statement,
+                "skipped": True,
+                "message": "Import already exists"
+            }
+        
+        # Find where to insert: after the last import above the first code line
+        first_code = _CODE_LINE.search(code)
+        limit = first_code.start() if first_code else len(code)
+        
+        insert_at = 0
+        for match in _IMPORT_LINE.finditer(code, 0, limit):
+            insert_at = match.end()
+        
+        prefix = '\n' if insert_at and code[insert_at - 1] != '\n' else ''
+        return (insert_at, insert_at, prefix + import_statement + '\n'), {
+            "import": import_statement,
+            "skipped": False
+        }
+    
+    @staticmethod
+    def _rename(code: str, edit: RenameFunction) -> Tuple[str, Dict]:
+        """Rename definition and calls in code, returning new code and counts"""
+        new_name = edit.new_name
+        
+        # Plain substring search first - no regex work when the name is absent
+        if edit.old_name not in code:
+            raise ValueError(f"Function '{edit.old_name}' not found")
+        
+        if edit.old_name.isidentifier() and not keyword.iskeyword(edit.old_name):
+            # Normal case - plain string search, no regex
+            new_code, def_count, call_count = _rename_identifier(code, edit.old_name, new_name)
+        else:
+            new_code, def_count, call_count = _rename_regex(code, edit.old_name, new_name)
+        
+        if def_count == 0:
+            raise ValueError(f"Function '{edit.old_name}' not found")
+        
+        return new_code, {
+            "definitions_renamed": def_count,
+            "calls_updated": call_count
+        }
     
     # ============================================================================
     # UPDATE FUNCTION - Replace single function in file
@@ -178,55 +835,15 @@ class SmartCodeEditor:
             editor.update_function("auth.py", "login", new_code)
         """
         
-        # Read current file using YOUR FileSystem
-        result = self.fs.read_file(filepath)
+        result = self.apply_edits(filepath, [UpdateFunction(function_name, new_implementation)])
         if not result['success']:
             return result
         
-        code = result['content']
-        lines = code.split('\n')
+        if result.get('skipped'):
+            # Same implementation - nothing was written
+            return {"success": True, "skipped": True, "changes": result['edits'][0]}
         
-        # Parse code to find the function
-        elements = self.analyzer.parse_python(code)
-        func = self.analyzer.find_element(elements, function_name)
-        
-        if not func:
-            return {
-                "success": False,
-                "error": f"Function '{function_name}' not found in {filepath}"
-            }
-        
-        # Preserve original indentation
-        new_lines = new_implementation.split('\n')
-        indent = ' ' * func.indentation
-        indented_new = '\n'.join(
-            indent + line if line.strip() else line 
-            for line in new_lines
-        )
-        
-        # Replace ONLY the function (keep everything else)
-        new_code_lines = (
-            lines[:func.start_line] +      # Everything before function
-            [indented_new] +                # New function
-            lines[func.end_line:]           # Everything after function
-        )
-        
-        new_code = '\n'.join(new_code_lines)
-        
-        # Write back using YOUR FileSystem
-        write_result = self.fs.write_file(filepath, new_code)
-        
-        if write_result['success']:
-            return {
-                "success": True,
-                "changes": {
-                    "function": function_name,
-                    "lines_replaced": func.end_line - func.start_line,
-                    "file": filepath
-                }
-            }
-        
-        return write_result
+        return {"success": True, "changes": result['edits'][0]}
     
     # ============================================================================
     # ADD METHOD TO CLASS - Add new method to existing class
@@ -252,39 +869,7 @@ class SmartCodeEditor:
             editor.add_method_to_class("models.py", "User", method)
         """
         
-        result = self.fs.read_file(filepath)
-        if not result['success']:
-            return result
-        
-        code = result['content']
-        lines = code.split('\n')
-        
-        # Find the class
-        elements = self.analyzer.parse_python(code)
-        cls = self.analyzer.find_element(elements, class_name)
-        
-        if not cls:
-            return {"success": False, "error": f"Class '{class_name}' not found"}
-        
-        # Insert method at end of class
-        insert_at = cls.end_line - 1
-        
-        # Add proper indentation (class level + 4 spaces)
-        indent = ' ' * (cls.indentation + 4)
-        method_lines = [
-            indent + line if line.strip() else line 
-            for line in method_code.split('\n')
-        ]
-        
-        # Insert into code
-        new_code_lines = (
-            lines[:insert_at] +
-            [''] +                  # Blank line before method
-            method_lines +
-            lines[insert_at:]
-        )
-        
-        return self.fs.write_file(filepath, '\n'.join(new_code_lines))
+        return self.apply_edits(filepath, [AddMethod(class_name, method_code)])
     
     # ============================================================================
     # ADD IMPORT - Add import if not exists
@@ -306,35 +891,15 @@ class SmartCodeEditor:
             editor.add_import("app.py", "from flask import Flask")
         """
         
-        result = self.fs.read_file(filepath)
-        if not result['success']:
-            return result
-        
-        code = result['content']
-        
-        # Check if import already exists
-        if import_statement in code:
+        result = self.apply_edits(filepath, [AddImport(import_statement)])
+        if result['success'] and result.get('skipped'):
             return {
                 "success": True,
                 "skipped": True,
                 "message": "Import already exists"
             }
         
-        lines = code.split('\n')
-        
-        # Find where to insert (after other imports)
-        insert_at = 0
-        for i, line in enumerate(lines):
-            if line.strip().startswith(('import ', 'from ')):
-                insert_at = i + 1
-            elif line.strip() and not line.strip().startswith('#'):
-                # Found first non-import, non-comment line
-                break
-        
-        # Insert import
-        lines.insert(insert_at, import_statement)
-        
-        return self.fs.write_file(filepath, '\n'.join(lines))
+        return result
     
     # ============================================================================
     # RENAME FUNCTION - Rename function and all its calls
@@ -356,33 +921,11 @@ class SmartCodeEditor:
             editor.rename_function("app.py", "authenticate", "login_user")
         """
         
-        result = self.fs.read_file(filepath)
-        if not result['success']:
-            return result
-        
-        code = result['content']
-        
-        # Replace function definition: def old_name( -> def new_name(
-        def_pattern = rf'\bdef {re.escape(old_name)}\b'
-        def_count = len(re.findall(def_pattern, code))
-        
-        if def_count == 0:
-            return {"success": False, "error": f"Function '{old_name}' not found"}
-        
-        new_code = re.sub(def_pattern, f'def {new_name}', code)
-        
-        # Replace all function calls: old_name( -> new_name(
-        call_pattern = rf'\b{re.escape(old_name)}\('
-        call_count = len(re.findall(call_pattern, code))
-        new_code = re.sub(call_pattern, f'{new_name}(', new_code)
-        
-        result = self.fs.write_file(filepath, new_code)
+        result = self.apply_edits(filepath, [RenameFunction(old_name, new_name)])
         
         if result['success']:
-            result['changes'] = {
-                "definitions_renamed": def_count,
-                "calls_updated": call_count
-            }
+            # e.g. renamed to the same name - skipped, nothing written
+            result['changes'] = result.pop('edits')[0]
         
         return result
 
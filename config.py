@@ -9,11 +9,36 @@ FEATURES:
 ================================================================================
 """
 
+import atexit
+import contextlib
 import json
 import os
+import weakref
 from pathlib import Path
 from typing import Optional, Dict
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import keyring
+except ImportError:
+    keyring = None
+
+KEYRING_SERVICE = "ailib"
+
+# Live configs, flushed at exit in case a batch() was cut short. A WeakSet
+# so the hook doesn't keep every instance alive for the whole process.
+_live_configs = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all():
+    for config in list(_live_configs):
+        config.flush()
+
 
 class AILibConfig:
     """
@@ -22,6 +47,7 @@ class AILibConfig:
     Configuration is stored in:
     - workspace/.ailib/config.json (API keys, settings)
     - workspace/.ailib/project.json (Project-specific config)
+    - the OS keychain via keyring, when installed (API keys)
     """
     
     def __init__(self, project_root: str = "."):
@@ -35,12 +61,26 @@ class AILibConfig:
         self.config_dir = self.project_root / ".ailib"
         self.config_file = self.config_dir / "config.json"
         
+        # In-memory copy of config.json, re-read only when its mtime changes.
+        # Setters write it straight away, except inside batch(), which
+        # writes once at the end.
+        self._cache: Optional[Dict] = None
+        self._mtime: Optional[int] = None
+        self._dirty = False
+        self._batch_depth = 0
+        
+        # provider -> key as read from the keychain
+        self._api_key_cache: Dict[str, Optional[str]] = {}
+        
         # Create config directory if it doesn't exist
         self.config_dir.mkdir(parents=True, exist_ok=True)
         
         # Initialize config file if it doesn't exist
         if not self.config_file.exists():
             self._init_config()
+        
+        self._migrate_api_keys()
+        _live_configs.add(self)
     
     def _init_config(self):
         """Initialize default configuration"""
@@ -64,22 +104,87 @@ class AILibConfig:
         self._save_config(default_config)
     
     def _load_config(self) -> Dict:
-        """Load configuration from file"""
+        """Load configuration (cached, re-read only if the file changed)"""
+        if self._dirty:
+            # Unsaved changes win over what is on disk
+            return self._cache
+        
         try:
-            with open(self.config_file, 'r') as f:
-                return json.load(f)
+            mtime = self.config_file.stat().st_mtime_ns
+            if self._cache is None or mtime != self._mtime:
+                self._cache = self._loads(self.config_file.read_bytes())
+                self._mtime = mtime
+            return self._cache
         except Exception as e:
             print(f"⚠️  Error loading config: {e}")
             return {}
     
     def _save_config(self, config: Dict):
-        """Save configuration to file"""
+        """Save configuration to file (atomically - a crash never leaves it half-written)"""
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f, indent=2)
+            tmp_file = self.config_file.with_name(self.config_file.name + ".tmp")
+            with open(tmp_file, 'wb') as f:
+                f.write(self._dumps(config))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.config_file)
+            
+            self._cache = config
+            self._mtime = self.config_file.stat().st_mtime_ns
+            self._dirty = False
         except Exception as e:
             print(f"⚠️  Error saving config: {e}")
     
+    def _mark_dirty(self, config: Dict):
+        """Record a change - written now, or at the end of the current batch()"""
+        self._cache = config
+        self._dirty = True
+        if not self._batch_depth:
+            self.flush()
+    
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Group several setter calls into a single write of config.json
+        
+        Example:
+            with config.batch():
+                config.set_setting("a", 1)
+                config.set_setting("b", 2)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.flush()
+    
+    def flush(self) -> bool:
+        """
+        Write pending changes to config.json
+        
+        Returns:
+            True if nothing is left unsaved
+        """
+        if self._dirty:
+            self._save_config(self._cache)
+        return not self._dirty
+    
+    @staticmethod
+    def _loads(data: bytes) -> Dict:
+        """Parse config.json contents (orjson when installed)"""
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+    
+    @staticmethod
+    def _dumps(config: Dict) -> bytes:
+        """Serialize config with 2-space indent (orjson when installed)"""
+        if orjson is not None:
+            return orjson.dumps(config, option=orjson.OPT_INDENT_2)
+        return json.dumps(config, indent=2).encode('utf-8')
+    
     def _get_timestamp(self) -> str:
         """Get current timestamp"""
         from datetime import datetime
@@ -87,6 +192,61 @@ class AILibConfig:
     
     # ========== API KEY MANAGEMENT ==========
     
+    def _keyring_user(self, provider: str) -> str:
+        """Keychain entry name - keys stay per project, as in config.json"""
+        return f"{self.project_root}:{provider}"
+    
+    def _keyring_set(self, provider: str, api_key: str) -> bool:
+        """Store key in the OS keychain (False if keyring is missing or has no backend)"""
+        if keyring is None:
+            return False
+        try:
+            keyring.set_password(KEYRING_SERVICE, self._keyring_user(provider), api_key)
+            self._api_key_cache[provider] = api_key
+            return True
+        except Exception:
+            return False
+    
+    def _keyring_get(self, provider: str) -> Optional[str]:
+        """Key from the OS keychain, looked up once per process"""
+        if keyring is None:
+            return None
+        if provider not in self._api_key_cache:
+            try:
+                self._api_key_cache[provider] = keyring.get_password(
+                    KEYRING_SERVICE, self._keyring_user(provider)
+                )
+            except Exception:
+                self._api_key_cache[provider] = None
+        return self._api_key_cache[provider]
+    
+    def _keyring_delete(self, provider: str):
+        """Remove key from the OS keychain, if it is there"""
+        self._api_key_cache.pop(provider, None)
+        if keyring is None:
+            return
+        try:
+            keyring.delete_password(KEYRING_SERVICE, self._keyring_user(provider))
+        except Exception:
+            pass
+    
+    def _migrate_api_keys(self):
+        """Move plain-text keys from config.json into the keychain"""
+        if keyring is None:
+            return
+        
+        config = self._load_config()
+        api_keys = config.get("api_keys") or {}
+        moved = [
+            provider for provider, api_key in api_keys.items()
+            if api_key and self._keyring_set(provider, api_key)
+        ]
+        
+        if moved:
+            for provider in moved:
+                api_keys[provider] = None
+            self._save_config(config)
+    
     def set_api_key(self, provider: str, api_key: str) -> bool:
         """
         Set API key for a provider
@@ -104,10 +264,13 @@ class AILibConfig:
             if "api_keys" not in config:
                 config["api_keys"] = {}
             
-            config["api_keys"][provider.lower()] = api_key
+            # Keychain when available; config.json keeps only a placeholder
+            provider = provider.lower()
+            stored = self._keyring_set(provider, api_key)
+            config["api_keys"][provider] = None if stored else api_key
             config["last_updated"] = self._get_timestamp()
             
-            self._save_config(config)
+            self._mark_dirty(config)
             return True
         
         except Exception as e:
@@ -125,8 +288,13 @@ class AILibConfig:
             API key string or None if not found
         """
         try:
+            provider = provider.lower()
+            api_key = self._keyring_get(provider)
+            if api_key is not None:
+                return api_key
+            
             config = self._load_config()
-            return config.get("api_keys", {}).get(provider.lower())
+            return config.get("api_keys", {}).get(provider)
         except:
             return None
     
@@ -136,9 +304,10 @@ class AILibConfig:
             config = self._load_config()
             
             if "api_keys" in config and provider.lower() in config["api_keys"]:
+                self._keyring_delete(provider.lower())
                 config["api_keys"][provider.lower()] = None
                 config["last_updated"] = self._get_timestamp()
-                self._save_config(config)
+                self._mark_dirty(config)
                 return True
             
             return False
@@ -171,7 +340,7 @@ class AILibConfig:
             config["settings"][key] = value
             config["last_updated"] = self._get_timestamp()
             
-            self._save_config(config)
+            self._mark_dirty(config)
             return True
         except:
             return False
@@ -180,15 +349,22 @@ class AILibConfig:
         """Get all settings"""
         try:
             config = self._load_config()
-            return config.get("settings", {})
+            return dict(config.get("settings", {}))
         except:
             return {}
     
     # ========== UTILITY METHODS ==========
     
     def reset_config(self):
-        """Reset configuration to defaults"""
+        """Reset configuration to defaults (API keys in the OS keychain included)"""
+        providers = set(self._load_config().get("api_keys") or {}) | set(self._api_key_cache)
         self._init_config()
+        providers |= set(self._load_config().get("api_keys") or {})
+        
+        # Keychain entries live outside config.json and would outlive the reset
+        for provider in providers:
+            self._keyring_delete(provider)
+        self._api_key_cache.clear()
     
     def export_config(self, filepath: str, include_api_keys: bool = False) -> bool:
         """
@@ -202,12 +378,16 @@ class AILibConfig:
             True if successful
         """
         try:
-            config = self._load_config()
+            # Shallow copy - the loaded dict is the shared in-memory cache
+            config = dict(self._load_config())
             
             if not include_api_keys:
                 # Remove API keys for security
                 if "api_keys" in config:
                     config["api_keys"] = {k: "***HIDDEN***" for k in config["api_keys"]}
+            elif "api_keys" in config:
+                # Keys may live in the keychain rather than config.json
+                config["api_keys"] = {k: self.get_api_key(k) for k in config["api_keys"]}
             
             with open(filepath, 'w') as f:
                 json.dump(config, f, indent=2)
@@ -267,6 +447,9 @@ if __name__ == "__main__":
     path = config.get_config_path()
     print(f"  ✓ Config location: {path}")
     
+    print("\n[Test 8] Flush pending changes")
+    print(f"  ✓ Saved: {config.flush()}")
+    
     print("\n" + "="*70)
     print("✓ Configuration Manager Demo Complete!")
     print("="*70)
@@ -1,9 +1,30 @@
+import os
+
 from setuptools import setup, find_packages
 
+ext_modules = []
+
+# Optional: compile the code editor to C (AILIB_CYTHON=1 pip install .).
+# Opt-in only - a compiled code_editor.*.so shadows code_editor.py, so
+# with an editable install later edits to the .py would be ignored.
+if os.environ.get("AILIB_CYTHON") == "1":
+    try:
+        from Cython.Build import cythonize
+        ext_modules = cythonize(
+            ["code_editor.py"],
+            language_level=3,
+            quiet=True,
+            # Keep Python semantics: annotations are hints, not C type checks
+            compiler_directives={"annotation_typing": False},
+        )
+    except ImportError:
+        print("AILIB_CYTHON=1 but Cython is not installed - building pure Python")
+
 setup(
     name="ailib",
     version="1.0.0",
     packages=find_packages(),
+    ext_modules=ext_modules,
     install_requires=[
         "requests>=2.31.0",
     ],
@@ -6,20 +6,146 @@ ADD THIS TO YOUR EXISTING FILES
 ================================================================================
 """
 
+import os
+import sys
 import json
+import logging
 import pickle
 import hashlib
 import shutil
+import mmap
+import codecs
+import contextlib
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
 from datetime import datetime
 
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
 
 # ============================================================================
 # UPGRADE 1: BETTER CONTEXT MANAGER
 # ============================================================================
 # ADD THIS TO ailib_core.py
 
+# Files bigger than this are left out of the context
+CONTEXT_MAX_FILE_SIZE = 2 * 1024 * 1024
+CONTEXT_PREVIEW_CHARS = 1000
+# Below this many files a process pool costs more than it saves
+CONTEXT_PARALLEL_MIN_FILES = 200
+# Directories never searched for context files
+CONTEXT_SKIP_DIRS = frozenset({".ailib", "venv", "node_modules", "__pycache__", ".git"})
+
+
+def _walk_code_files(root: str, suffix: str) -> Iterator[str]:
+    """
+    Paths of files ending in suffix under root, skipping CONTEXT_SKIP_DIRS
+    
+    Missing or unreadable directories are skipped, as glob does.
+    """
+    try:
+        with os.scandir(root) as entries:
+            subdirs = []
+            for entry in entries:
+                if entry.name in CONTEXT_SKIP_DIRS:
+                    continue
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir:
+                    subdirs.append(entry.path)
+                elif entry.name.endswith(suffix):
+                    yield entry.path
+    except OSError:
+        return
+    
+    for subdir in subdirs:
+        yield from _walk_code_files(subdir, suffix)
+
+
+def _universal_newlines(text: str) -> str:
+    """Translate CRLF and lone CR to LF, as text-mode reads do"""
+    if '\r' not in text:
+        return text
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def _count_newlines(data) -> int:
+    """Count newlines in a bytes-like object (e.g. an mmap) a chunk at a time, never copying it whole"""
+    chunk = 64 * 1024
+    return sum(data[i:i + chunk].count(b'\n') for i in range(0, len(data), chunk))
+
+
+def _summarize_file(file_path: str, analyze_python: bool) -> Optional[Dict]:
+    """
+    Size, line count and preview of one file (plus functions/classes for Python)
+    
+    The file is memory-mapped, so only Python files get decoded in full -
+    other files decode just the preview. Returns None for oversized or
+    unreadable files. Module-level so process pool workers can run it.
+    """
+    try:
+        size = os.stat(file_path).st_size
+        if size > CONTEXT_MAX_FILE_SIZE:
+            return None
+        
+        # mmap can't map an empty file; b'' slices the same way
+        with open(file_path, 'rb') as f, (
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size
+            else contextlib.nullcontext(b'')
+        ) as data:
+            if analyze_python:
+                # str() decodes straight from the mapping - no bytes copy
+                content = _universal_newlines(str(data, 'utf-8'))
+                preview = content[:CONTEXT_PREVIEW_CHARS]
+                lines = content.count('\n') + 1
+            else:
+                # At most 4 bytes per char, so this always covers the preview;
+                # the incremental decoder holds back a char cut off at the end
+                head = data[:4 * CONTEXT_PREVIEW_CHARS]
+                preview = codecs.getincrementaldecoder('utf-8')().decode(head)
+                preview = _universal_newlines(preview)[:CONTEXT_PREVIEW_CHARS]
+                lines = _count_newlines(data) + 1
+    
+    except (OSError, UnicodeDecodeError):
+        # Skip files that can't be read
+        return None
+    
+    file_info = {
+        "size": size,
+        "lines": lines,
+        "content_preview": preview  # First 1000 chars
+    }
+    
+    if analyze_python:
+        from code_editor import get_shared_analyzer
+        
+        elements = get_shared_analyzer().parse_python(content)
+        file_info["functions"] = [e.name for e in elements if e.type == 'function']
+        file_info["classes"] = [e.name for e in elements if e.type == 'class']
+    
+    return file_info
+
+
 class ContextBuilder:
     """
     Builds rich context for AI by reading existing files
@@ -48,8 +174,6 @@ class ContextBuilder:
                 }
             }
         """
-        from code_editor import CodeAnalyzer
-        
         context = {
             "language": schema.language if schema else "python",
             "framework": schema.framework if schema else "none",
@@ -57,48 +181,42 @@ class ContextBuilder:
         }
         
         # Find all relevant code files
-        patterns = {
-            "python": "**/*.py",
-            "javascript": "**/*.js",
-            "typescript": "**/*.ts"
+        suffixes = {
+            "python": ".py",
+            "javascript": ".js",
+            "typescript": ".ts"
         }
         
-        pattern = patterns.get(context["language"], "**/*.py")
+        suffix = suffixes.get(context["language"], ".py")
+        analyze_python = context["language"] == "python"
         
-        for file_path in self.project_root.glob(pattern):
-            # Skip irrelevant directories
-            if any(skip in str(file_path) for skip in [".ailib", "venv", "node_modules", "__pycache__"]):
-                continue
-            
+        root = str(self.project_root)
+        file_paths = list(_walk_code_files(root, suffix))
+        
+        # Read preview and analyze structure (for Python)
+        summaries = None
+        if len(file_paths) >= CONTEXT_PARALLEL_MIN_FILES:
+            # Parsing is CPU-bound - fan the files out over all cores
+            workers = min(os.cpu_count() or 1, len(file_paths))
             try:
-                rel_path = str(file_path.relative_to(self.project_root))
-                
-                # Read file
-                result = self.dev_manager.fs.read_file(rel_path)
-                if not result['success']:
-                    continue
-                
-                content = result['content']
-                
-                # Analyze structure (for Python)
-                file_info = {
-                    "size": len(content),
-                    "lines": len(content.split('\n')),
-                    "content_preview": content[:1000]  # First 1000 chars
-                }
-                
-                if context["language"] == "python":
-                    analyzer = CodeAnalyzer()
-                    elements = analyzer.parse_python(content)
-                    
-                    file_info["functions"] = [e.name for e in elements if e.type == 'function']
-                    file_info["classes"] = [e.name for e in elements if e.type == 'class']
-                
-                context["files"][rel_path] = file_info
-            
-            except Exception as e:
-                # Skip files that can't be read
-                continue
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    summaries = list(executor.map(
+                        _summarize_file, file_paths, repeat(analyze_python), chunksize=64
+                    ))
+            except (BrokenProcessPool, OSError, ImportError, NotImplementedError):
+                # No working multiprocessing here (sandbox without semaphores,
+                # spawn failing in an embedding) - _summarize_file handles its
+                # own I/O errors, so these come from the pool itself
+                summaries = None
+        
+        if summaries is None:
+            summaries = map(_summarize_file, file_paths, repeat(analyze_python))
+        
+        # Walked paths all start with root + separator
+        prefix_len = len(os.path.join(root, ''))
+        for file_path, file_info in zip(file_paths, summaries):
+            if file_info is not None:
+                context["files"][file_path[prefix_len:]] = file_info
         
         return context
 
@@ -108,40 +226,98 @@ class ContextBuilder:
 # ============================================================================
 # ADD THIS TO ai_engine.py
 
+# Small on purpose: the cache pins its prompt strings, which can be large
+@lru_cache(maxsize=256)
+def _cache_key(prompt: str, context: str) -> str:
+    """Cache key for prompt + context (hashed in parts, no combined copy)"""
+    # xxh3 when installed - keys only name files, nothing cryptographic needed
+    h = xxhash.xxh3_128() if xxhash else hashlib.blake2b(digest_size=16)
+    h.update(prompt.encode('utf-8'))
+    h.update(b'::')
+    h.update(context.encode('utf-8'))
+    return h.hexdigest()
+
+
 class AICache:
     """
     Caches AI responses to save API calls and money
     """
     
+    # Entries older than this (seconds) are ignored
+    CACHE_TTL = 7 * 86400
+    
     def __init__(self, cache_dir: str = ".ailib/cache"):
+        # Created on the first set(), not on every startup
         self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
         
         # Stats
         self.hits = 0
         self.misses = 0
+        
+        # Keys with a .pkl file, read from the directory on first get() so
+        # hits skip the stat. Only a hint: entries written by other processes
+        # since the scan are found by checking the file on a miss.
+        self._known_keys: Optional[set] = None
     
     def _get_cache_key(self, prompt: str, context: str = "") -> str:
         """Generate cache key from prompt + context"""
-        combined = f"{prompt}::{context}"
-        return hashlib.md5(combined.encode()).hexdigest()
+        # Memoized: get() then set() for one response hash the prompt once
+        return _cache_key(prompt, context)
+    
+    def _entry_path(self, cache_key: str) -> Path:
+        """Entry file, sharded by the key's first two hex digits (like git objects)"""
+        return self.cache_dir / cache_key[:2] / f"{cache_key}.pkl"
+    
+    def _entry_files(self, flat: bool = False) -> Iterator[os.DirEntry]:
+        """
+        scandir entries of the .pkl files in the shard directories. flat
+        also yields .pkl files directly in cache_dir, where entries lived
+        before sharding.
+        """
+        shards = []
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir() and len(entry.name) == 2:
+                        shards.append(entry.path)
+                    elif flat and entry.name.endswith('.pkl'):
+                        yield entry
+        except FileNotFoundError:
+            return
+        
+        for shard in shards:
+            with os.scandir(shard) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.pkl'):
+                        yield entry
     
     def get(self, prompt: str, context: str = "") -> Dict:
         """Get cached response"""
         cache_key = self._get_cache_key(prompt, context)
-        cache_file = self.cache_dir / f"{cache_key}.pkl"
+        cache_file = self._entry_path(cache_key)
+        
+        if self._known_keys is None:
+            self._known_keys = {e.name[:-4] for e in self._entry_files()}
         
-        if cache_file.exists():
+        if cache_key not in self._known_keys and os.path.exists(cache_file):
+            self._known_keys.add(cache_key)
+        
+        if cache_key in self._known_keys:
             try:
-                with open(cache_file, 'rb') as f:
-                    cached = pickle.load(f)
+                # One read of the whole file, then unpickle from memory -
+                # pickle.load(f) issues many small reads through the buffer
+                cached = pickle.loads(cache_file.read_bytes())
                 
-                # Check if cache is recent (within 7 days)
-                age_days = (datetime.now() - cached['timestamp']).days
-                if age_days < 7:
+                # Check if cache is recent (within 7 days) - plain float
+                # math; entries from older versions hold a datetime and miss
+                if time.time() - cached['timestamp'] < self.CACHE_TTL:
                     self.hits += 1
-                    print(f"  💾 Using cached response (saved API call)")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Using cached response %s (saved API call)", cache_key)
                     return cached['data']
+            except FileNotFoundError:
+                # Removed behind our back (another process cleared the cache)
+                self._known_keys.discard(cache_key)
             except:
                 pass
         
@@ -151,21 +327,31 @@ class AICache:
     def set(self, prompt: str, context: str, data: Dict):
         """Cache a response"""
         cache_key = self._get_cache_key(prompt, context)
-        cache_file = self.cache_dir / f"{cache_key}.pkl"
+        cache_file = self._entry_path(cache_key)
         
         cached = {
-            'timestamp': datetime.now(),
+            'timestamp': time.time(),
             'data': data
         }
         
-        with open(cache_file, 'wb') as f:
-            pickle.dump(cached, f)
+        try:
+            f = open(cache_file, 'wb')
+        except FileNotFoundError:
+            # Shard directory (and cache_dir) are created on first use
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            f = open(cache_file, 'wb')
+        with f:
+            pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+        if self._known_keys is not None:
+            self._known_keys.add(cache_key)
     
     def clear(self):
         """Clear all cache"""
-        for cache_file in self.cache_dir.glob("*.pkl"):
-            cache_file.unlink()
+        # Flat files are from before sharding
+        for entry in list(self._entry_files(flat=True)):
+            os.unlink(entry.path)
         
+        self._known_keys = None
         self.hits = 0
         self.misses = 0
     
@@ -179,7 +365,7 @@ class AICache:
             "misses": self.misses,
             "total_requests": total,
             "hit_rate": f"{hit_rate:.1f}%",
-            "cache_size": len(list(self.cache_dir.glob("*.pkl")))
+            "cache_size": sum(1 for _ in self._entry_files())
         }
 
 
@@ -188,6 +374,179 @@ class AICache:
 # ============================================================================
 # ADD THIS TO ailib_core.py
 
+# Never worth keeping in a backup
+BACKUP_SKIP_NAMES = frozenset({".ailib", "__pycache__"})
+# Where a backup keeps its manifest - .ailib is never backed up or restored,
+# so this can't clash with a project file
+BACKUP_MANIFEST = os.path.join(".ailib", "manifest.json")
+# Copies are I/O bound, so threads overlap them despite the GIL
+BACKUP_COPY_WORKERS = 8
+BACKUP_PARALLEL_MIN_FILES = 16
+# Files at least this big are copied in-kernel with copy_file_range
+BACKUP_KERNEL_COPY_MIN = 64 * 1024
+# Linux ioctl that makes a copy-on-write clone of a file (Btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+# Devices where cloning already failed, so it isn't retried per file
+_no_reflink_devices = set()
+
+
+def _try_reflink(src: str, dst: str, device: int) -> bool:
+    """
+    Clone src to dst copy-on-write if the filesystem supports it
+    
+    The clone shares data blocks with src until either file is written,
+    so it takes no time or space. Returns False if cloning isn't possible.
+    """
+    if device in _no_reflink_devices:
+        return False
+    
+    try:
+        if sys.platform.startswith('linux') and fcntl is not None:
+            with open(src, 'rb') as src_file, open(dst, 'wb') as dst_file:
+                fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+        elif sys.platform == 'darwin':
+            import ctypes
+            libc = ctypes.CDLL(None, use_errno=True)
+            if libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) != 0:
+                raise OSError(ctypes.get_errno(), "clonefile failed")
+        else:
+            return False
+    except (OSError, AttributeError):
+        _no_reflink_devices.add(device)
+        with contextlib.suppress(OSError):
+            os.unlink(dst)
+        return False
+    
+    shutil.copystat(src, dst)
+    return True
+
+
+def _kernel_copy(src: str, dst: str, size: int):
+    """
+    Copy src to dst with os.copy_file_range, plus copy2's metadata
+    
+    The bytes never pass through user space, and filesystems that can
+    (NFS 4.2, Btrfs, XFS) do the copy server-side or share extents.
+    """
+    with open(src, 'rb') as src_file, open(dst, 'wb') as dst_file:
+        in_fd, out_fd = src_file.fileno(), dst_file.fileno()
+        remaining = size
+        while remaining > 0:
+            copied = os.copy_file_range(in_fd, out_fd, min(remaining, 2 ** 30))
+            if copied == 0:
+                # File shrank while copying
+                break
+            remaining -= copied
+    shutil.copystat(src, dst)
+
+
+def _link_or_copy(entry: os.DirEntry, dst: str, prev: Optional[str]):
+    """
+    Hardlink dst to prev (the same file, unchanged, in the last snapshot),
+    else clone it copy-on-write, else copy it
+    
+    Links only ever point into older backups, never at project files: the
+    editor rewrites files in place, which would change a linked backup too.
+    A reflink clone is a separate file, so cloning project files is safe.
+    
+    An existing dst is unlinked first: it may be a hardlink shared with
+    other snapshots, and writing through it would change them too.
+    """
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(dst)
+    
+    if prev is not None:
+        try:
+            os.link(prev, dst)
+            return
+        except OSError:
+            # Snapshot file gone, cross-device, or no hardlink support
+            pass
+    
+    st = entry.stat()
+    if _try_reflink(entry.path, dst, st.st_dev):
+        return
+    
+    if st.st_size >= BACKUP_KERNEL_COPY_MIN and hasattr(os, 'copy_file_range'):
+        try:
+            _kernel_copy(entry.path, dst, st.st_size)
+            return
+        except OSError:
+            # Cross-device on older kernels, or unsupported filesystem
+            pass
+    shutil.copy2(entry.path, dst)
+
+
+def _plan_tree(src: str, dst: str, prev: Optional[str], prev_manifest: Dict,
+               manifest: Dict, jobs: List[tuple], rel: str = ""):
+    """
+    Create dst's directories and collect (entry, target, previous) file jobs
+    
+    previous is set only when the file's (mtime_ns, size) matches
+    prev_manifest; every file's stamp is recorded in manifest.
+    """
+    os.makedirs(dst, exist_ok=True)
+    with os.scandir(src) as entries:
+        for entry in entries:
+            if entry.name in BACKUP_SKIP_NAMES or entry.name.endswith('.pyc'):
+                continue
+            
+            target = os.path.join(dst, entry.name)
+            entry_rel = f"{rel}/{entry.name}" if rel else entry.name
+            
+            if entry.is_dir():
+                _plan_tree(entry.path, target, prev, prev_manifest, manifest, jobs, entry_rel)
+            elif entry.is_file():
+                st = entry.stat()
+                stamp = [st.st_mtime_ns, st.st_size]
+                manifest[entry_rel] = stamp
+                
+                previous = None
+                if prev is not None and prev_manifest.get(entry_rel) == stamp:
+                    previous = os.path.join(prev, *entry_rel.split("/"))
+                jobs.append((entry, target, previous))
+
+
+def _hardlink_tree(src: str, dst: str, prev: Optional[str] = None,
+                   prev_manifest: Optional[Dict] = None) -> Dict:
+    """
+    Snapshot src into dst, hardlinking files unchanged since the snapshot prev
+    
+    A file counts as unchanged if its (mtime_ns, size) is the one recorded
+    in prev_manifest. Directories are all created first, then the files are
+    linked/copied - on a thread pool when there are enough of them.
+    
+    Returns:
+        Manifest for dst: relative path -> [mtime_ns, size]
+    """
+    manifest: Dict = {}
+    jobs: List[tuple] = []
+    _plan_tree(src, dst, prev, prev_manifest or {}, manifest, jobs)
+    
+    if len(jobs) < BACKUP_PARALLEL_MIN_FILES:
+        for job in jobs:
+            _link_or_copy(*job)
+        return manifest
+    
+    with ThreadPoolExecutor(max_workers=BACKUP_COPY_WORKERS) as pool:
+        # list() re-raises the first failed copy
+        list(pool.map(lambda job: _link_or_copy(*job), jobs))
+    return manifest
+
+
+def _tree_size(path: str) -> int:
+    """Total size of the files under path (scandir entries carry their stat)"""
+    total = 0
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                total += _tree_size(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                total += entry.stat(follow_symlinks=False).st_size
+    return total
+
+
 class BackupManager:
     """
     Creates backups before risky operations
@@ -207,24 +566,46 @@ class BackupManager:
             backup_id: Unique ID for this backup
         """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_id = f"{timestamp}_{label}" if label else timestamp
+        base_id = f"{timestamp}_{label}" if label else timestamp
+        
+        # Unchanged files share storage with the latest backup (names start
+        # with the timestamp, so they sort oldest first). Looked up before
+        # the new directory exists, so it's never the backup being written.
+        with os.scandir(self.backup_dir) as entries:
+            previous = max((e.path for e in entries if e.is_dir()), default=None)
+        
+        # Never reuse a directory - its files may be hardlinked into older
+        # backups. A second backup in the same second gets a _2, _3... suffix.
+        backup_id = base_id
+        suffix = 1
+        while True:
+            backup_path = self.backup_dir / backup_id
+            try:
+                backup_path.mkdir()
+                break
+            except FileExistsError:
+                suffix += 1
+                backup_id = f"{base_id}_{suffix}"
+        
+        prev_manifest = {}
+        if previous is not None:
+            try:
+                with open(os.path.join(previous, BACKUP_MANIFEST), 'r', encoding='utf-8') as f:
+                    prev_manifest = json.load(f)
+            except (OSError, ValueError):
+                # Older or incomplete backup - copy everything
+                pass
         
-        backup_path = self.backup_dir / backup_id
+        # Snapshot all files except the .ailib directory
+        manifest = _hardlink_tree(str(self.project_root), str(backup_path), previous, prev_manifest)
         
-        # Copy all files except .ailib directory
-        for item in self.project_root.iterdir():
-            if item.name == ".ailib":
-                continue
-            
-            dest = backup_path / item.name
-            
-            if item.is_file():
-                dest.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(item, dest)
-            elif item.is_dir():
-                shutil.copytree(item, dest, ignore=shutil.ignore_patterns('*.pyc', '__pycache__'))
+        # Written last, so an interrupted backup is never linked against
+        manifest_path = backup_path / BACKUP_MANIFEST
+        manifest_path.parent.mkdir(exist_ok=True)
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
         
-        print(f"  💾 Backup created: {backup_id}")
+        logger.info("Backup created: %s", backup_id)
         
         # Keep only last 10 backups
         self._cleanup_old_backups(keep=10)
@@ -244,56 +625,78 @@ class BackupManager:
         backup_path = self.backup_dir / backup_id
         
         if not backup_path.exists():
-            print(f"  ❌ Backup not found: {backup_id}")
+            logger.error("Backup not found: %s", backup_id)
             return False
         
-        # Remove current files (except .ailib)
-        for item in self.project_root.iterdir():
-            if item.name == ".ailib":
-                continue
-            
-            if item.is_file():
-                item.unlink()
-            elif item.is_dir():
-                shutil.rmtree(item)
-        
-        # Restore from backup
-        for item in backup_path.iterdir():
-            dest = self.project_root / item.name
-            
-            if item.is_file():
-                shutil.copy2(item, dest)
-            elif item.is_dir():
-                shutil.copytree(item, dest)
+        # Stage the restored tree under .ailib - same filesystem as the
+        # project, so the swap below is renames only. The project is left
+        # untouched until the copy is complete.
+        token = uuid.uuid4().hex[:8]
+        staging = self.project_root / ".ailib" / f"restore_{token}"
+        replaced = self.project_root / ".ailib" / f"replaced_{token}"
+        
+        try:
+            # No previous snapshot, so every file is cloned/copied
+            _hardlink_tree(str(backup_path), str(staging))
+        except OSError as e:
+            shutil.rmtree(staging, ignore_errors=True)
+            logger.error("Restore failed: %s", e)
+            return False
         
-        print(f"  ✅ Restored from backup: {backup_id}")
+        # Move current files (except .ailib) aside
+        replaced.mkdir()
+        moved = []
+        try:
+            for item in self.project_root.iterdir():
+                if item.name != ".ailib":
+                    os.rename(item, replaced / item.name)
+                    moved.append(item.name)
+        except OSError as e:
+            # e.g. a file locked on Windows - put everything back
+            for name in moved:
+                os.rename(replaced / name, self.project_root / name)
+            shutil.rmtree(staging, ignore_errors=True)
+            replaced.rmdir()
+            logger.error("Restore failed: %s", e)
+            return False
+        
+        # Move the restored files in
+        for item in staging.iterdir():
+            os.rename(item, self.project_root / item.name)
+        staging.rmdir()
+        
+        # Nothing uses the old files now, so delete them without waiting
+        threading.Thread(target=shutil.rmtree, args=(replaced, True)).start()
+        
+        logger.info("Restored from backup: %s", backup_id)
         return True
     
     def list_backups(self) -> List[Dict]:
         """List all available backups"""
         backups = []
         
-        for backup_path in sorted(self.backup_dir.iterdir()):
-            if backup_path.is_dir():
-                # Get backup info
-                stat = backup_path.stat()
-                
-                backups.append({
-                    "id": backup_path.name,
-                    "created": datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                    "size": sum(f.stat().st_size for f in backup_path.rglob('*') if f.is_file())
-                })
+        with os.scandir(self.backup_dir) as entries:
+            backup_dirs = sorted((e for e in entries if e.is_dir()), key=lambda e: e.name)
+        
+        for entry in backup_dirs:
+            backups.append({
+                "id": entry.name,
+                "created": datetime.fromtimestamp(entry.stat().st_ctime).isoformat(),
+                "size": _tree_size(entry.path)
+            })
         
         return backups
     
     def _cleanup_old_backups(self, keep: int = 10):
         """Keep only the most recent N backups"""
-        backups = sorted(self.backup_dir.iterdir(), key=lambda p: p.stat().st_ctime)
+        # Stat each entry once, up front, rather than inside the sort
+        with os.scandir(self.backup_dir) as entries:
+            backups = sorted((e.stat().st_ctime, e.path, e.is_dir()) for e in entries)
         
         # Delete oldest backups
-        for old_backup in backups[:-keep]:
-            if old_backup.is_dir():
-                shutil.rmtree(old_backup)
+        for _, path, is_dir in backups[:-keep]:
+            if is_dir:
+                shutil.rmtree(path)
 
 
 # ============================================================================
@@ -471,7 +874,8 @@ INTEGRATION GUIDE:
                 for b in backups:
                     print(f"  {b['id']} - {b['created']}")
             elif backup_id:
-                ailib.backup_manager.restore_backup(backup_id)
+                if ailib.backup_manager.restore_backup(backup_id):
+                    print(f"Restored from backup: {backup_id}")
         
         elif command == "cache":
             subcommand = sys.argv[2] if len(sys.argv) > 2 else "stats"